@@ -25,6 +25,7 @@ import zlib
 import os
 import glob
 import ctypes
+import mmap
 import platform
 from pathlib import Path
 from datetime import datetime
@@ -107,6 +108,7 @@ class CheatDialog(tk.Toplevel):
         self.refresh_list()
 
     def refresh_list(self):
+        # Full rebuild: only needed for the initial population.
         self.listbox.delete(0, tk.END)
         for name, code in self.emulator.cheats.list_cheats():
             self.listbox.insert(tk.END, f"{name}: {code}")
@@ -116,23 +118,161 @@ class CheatDialog(tk.Toplevel):
         code = simpledialog.askstring("Cheat Code", "Enter code:")
         if name and code:
             self.emulator.cheats.add_cheat(name, code)
-            self.refresh_list()
+            self.listbox.insert(tk.END, f"{name}: {code}")
 
     def remove_cheat(self):
         selection = self.listbox.curselection()
         if selection:
             self.emulator.cheats.remove_cheat(selection[0])
-            self.refresh_list()
+            self.listbox.delete(selection[0])
 
 # ============================================================================
 # ZILMAR/PROJECT64 PLUGIN BRIDGE (Windows-only)
 # ============================================================================
-ZILMAR_TYPE_MAP = {1: "RSP", 2: "GFX", 3: "AUDIO", 4: "INPUT"}
+# Plugin type codes are 1..4, so a positional tuple beats a dict lookup
+# (no hashing) everywhere type_name is read.
+_ZTYPE_ARR = (None, "RSP", "GFX", "AUDIO", "INPUT")
+
+# Characteristic exports that identify a plugin's type without loading it.
+ZILMAR_PROBE_EXPORTS = (
+    ("InitiateGFX", "GFX"),
+    ("InitiateAudio", "AUDIO"),
+    ("InitiateControllers", "INPUT"),
+    ("DoRspCycles", "RSP"),
+)
 
 class ZilmarPluginError(Exception):
     pass
 
 
+def _probe_pe(path):
+    """Read a DLL's export table straight from the PE headers.
+
+    Returns (internal_dll_name, set_of_export_names) without ever invoking
+    the OS loader, or None if the file is not a parseable PE. Offsets follow
+    the PE spec: DOS header -> e_lfanew -> COFF -> optional header data
+    directory 0 (exports) -> section table for RVA translation.
+    """
+    try:
+        with open(path, "rb") as f:
+            m = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+            try:
+                if m[:2] != b"MZ":
+                    return None
+                pe = struct.unpack_from("<I", m, 0x3C)[0]
+                if m[pe:pe+4] != b"PE\x00\x00":
+                    return None
+                coff = pe + 4
+                n_sections, = struct.unpack_from("<H", m, coff + 2)
+                opt_size, = struct.unpack_from("<H", m, coff + 16)
+                opt = coff + 20
+                magic, = struct.unpack_from("<H", m, opt)
+                if magic == 0x10B:      # PE32
+                    export_rva, = struct.unpack_from("<I", m, opt + 96)
+                elif magic == 0x20B:    # PE32+
+                    export_rva, = struct.unpack_from("<I", m, opt + 112)
+                else:
+                    return None
+                if not export_rva:
+                    return None
+                sections = []
+                sec = opt + opt_size
+                for i in range(n_sections):
+                    base = sec + 40 * i
+                    vsize, va, rawsize, rawptr = struct.unpack_from("<IIII", m, base + 8)
+                    sections.append((va, max(vsize, rawsize), rawptr))
+
+                def rva_to_off(rva):
+                    for va, size, rawptr in sections:
+                        if va <= rva < va + size:
+                            return rva - va + rawptr
+                    return None
+
+                def read_cstr(off):
+                    end = m.find(b"\x00", off)
+                    return m[off:end].decode("ascii", errors="ignore")
+
+                exp = rva_to_off(export_rva)
+                if exp is None:
+                    return None
+                name_rva, = struct.unpack_from("<I", m, exp + 0x0C)
+                n_names, = struct.unpack_from("<I", m, exp + 0x18)
+                names_rva, = struct.unpack_from("<I", m, exp + 0x20)
+                names_off = rva_to_off(names_rva)
+                if names_off is None:
+                    return None
+                exports = set()
+                for i in range(n_names):
+                    rva, = struct.unpack_from("<I", m, names_off + 4 * i)
+                    off = rva_to_off(rva)
+                    if off is not None:
+                        exports.add(read_cstr(off))
+                dll_name = ""
+                name_off = rva_to_off(name_rva)
+                if name_off is not None:
+                    dll_name = read_cstr(name_off)
+                return dll_name, exports
+            finally:
+                m.close()
+    except (OSError, struct.error, ValueError):
+        return None
+
+
+class ZilmarPluginStub:
+    """Plugin record built from the PE export table alone.
+
+    Mirrors the ZilmarPlugin surface used by the manager and the dialog,
+    but defers the real LoadLibrary until config()/about() actually need
+    the DLL — scanning a directory no longer loads every candidate.
+    """
+
+    def __init__(self, path, name, type_name):
+        self.path = path
+        self._name = name
+        self._type_name = type_name
+        self._real = None
+
+    @classmethod
+    def probe(cls, path):
+        parsed = _probe_pe(path)
+        if parsed is None:
+            raise ZilmarPluginError("Not a parseable PE file")
+        dll_name, exports = parsed
+        if "GetDllInfo" not in exports:
+            raise ZilmarPluginError("Not a zilmar plugin (GetDllInfo missing)")
+        for export, type_name in ZILMAR_PROBE_EXPORTS:
+            if export in exports:
+                break
+        else:
+            raise ZilmarPluginError("Unrecognized zilmar plugin type")
+        name = dll_name.rsplit(".", 1)[0] if dll_name else Path(path).stem
+        return cls(path, name, type_name)
+
+    def _loaded(self):
+        if self._real is None:
+            self._real = ZilmarPlugin(self.path)
+        return self._real
+
+    @property
+    def type_name(self):
+        return self._type_name
+
+    @property
+    def type_code(self):
+        return _ZTYPE_ARR.index(self._type_name) if self._type_name in _ZTYPE_ARR else 0
+
+    @property
+    def name(self):
+        # The real plugin name (from GetDllInfo) once loaded; PE name before.
+        return self._real.name if self._real is not None else self._name
+
+    def config(self, parent_hwnd=None):
+        return self._loaded().config(parent_hwnd)
+
+    def about(self, parent_hwnd=None):
+        return self._loaded().about(parent_hwnd)
+
+
 class PLUGIN_INFO(ctypes.Structure):
     _fields_ = [
         ("Version", ctypes.c_uint16),
@@ -170,6 +310,19 @@ class ZilmarPlugin:
         info = PLUGIN_INFO()
         fn(ctypes.byref(info))
         self.info = info
+        # Resolve and prototype the optional entry points once at load time;
+        # a missing export is cached as None so calls skip getattr entirely.
+        self._config_fn = self._bind("DllConfig", [ctypes.c_void_p])
+        self._about_fn = self._bind("DllAbout", [ctypes.c_void_p])
+        self._rom_open_fn = self._bind("RomOpen", [])
+        self._rom_closed_fn = self._bind("RomClosed", [])
+
+    def _bind(self, name, argtypes):
+        fn = getattr(self.dll, name, None)
+        if fn is not None:
+            fn.argtypes = argtypes
+            fn.restype = None
+        return fn
 
     @property
     def type_code(self):
@@ -177,26 +330,35 @@ class ZilmarPlugin:
 
     @property
     def type_name(self):
-        return ZILMAR_TYPE_MAP.get(self.type_code, f"UNKNOWN({self.type_code})")
+        t = self.type_code
+        return _ZTYPE_ARR[t] if 0 < t < 5 else f"UNKNOWN({t})"
 
     @property
     def name(self):
         return self.info.Name.decode("ascii", errors="ignore").strip("\x00")
 
     def config(self, parent_hwnd=None):
-        fn = getattr(self.dll, "DllConfig", None)
-        if not fn:
+        if self._config_fn is None:
             return False
-        fn.argtypes = [ctypes.c_void_p]
-        fn(ctypes.c_void_p(parent_hwnd or 0))
+        self._config_fn(ctypes.c_void_p(parent_hwnd or 0))
         return True
 
     def about(self, parent_hwnd=None):
-        fn = getattr(self.dll, "DllAbout", None)
-        if not fn:
+        if self._about_fn is None:
+            return False
+        self._about_fn(ctypes.c_void_p(parent_hwnd or 0))
+        return True
+
+    def rom_open(self):
+        if self._rom_open_fn is None:
+            return False
+        self._rom_open_fn()
+        return True
+
+    def rom_closed(self):
+        if self._rom_closed_fn is None:
             return False
-        fn.argtypes = [ctypes.c_void_p]
-        fn(ctypes.c_void_p(parent_hwnd or 0))
+        self._rom_closed_fn()
         return True
 
 
@@ -207,23 +369,60 @@ class ZilmarPluginManager:
         appdata = os.environ.get("APPDATA", "")
         pj64_plugin = os.path.join(appdata, "Project64", "Plugin") if appdata else ""
         self.search_paths = [str(Path.cwd() / "plugins"), pj64_plugin, str(Path.cwd())]
+        cache_root = appdata if appdata else os.path.expanduser("~")
+        self.cache_path = os.path.join(cache_root, "EMU64", "plugin_cache.json")
+        self._cache = {}
+
+    def _load_cache(self):
+        try:
+            with open(self.cache_path, "r", encoding="utf-8") as f:
+                data = json.load(f)
+            return data if isinstance(data, dict) else {}
+        except (OSError, ValueError):
+            return {}
+
+    def _save_cache(self):
+        tmp = self.cache_path + ".tmp"
+        try:
+            os.makedirs(os.path.dirname(self.cache_path), exist_ok=True)
+            with open(tmp, "w", encoding="utf-8") as f:
+                json.dump(self._cache, f)
+            os.replace(tmp, self.cache_path)
+        except OSError:
+            pass
 
     def scan(self):
         self.plugins = {"GFX": [], "AUDIO": [], "INPUT": [], "RSP": []}
         if os.name != "nt":
             return self.plugins
-        seen = set()
-        for base in filter(None, self.search_paths):
-            for dll in glob.glob(os.path.join(base, "*.dll")):
-                key = dll.lower()
-                if key in seen:
-                    continue
-                try:
-                    p = ZilmarPlugin(dll)
-                    self.plugins[p.type_name].append(p)
-                    seen.add(key)
-                except Exception:
-                    pass
+        self._cache = self._load_cache()
+        dirty = False
+        # Canonicalize up front: overlapping search paths (e.g. cwd and
+        # cwd/plugins) collapse to one realpath each, so every DLL is
+        # stat'd and probed at most once.
+        paths = {os.path.realpath(p)
+                 for base in filter(None, self.search_paths)
+                 for p in glob.iglob(os.path.join(base, "*.dll"))}
+        for dll in sorted(paths):
+            try:
+                st = os.stat(dll)
+            except OSError:
+                continue
+            ck = f"{dll.lower()}|{int(st.st_mtime)}|{st.st_size}"
+            hit = self._cache.get(ck)
+            if hit and hit[0] in self.plugins:
+                # unchanged file: rebuild the stub from the cache, no probe
+                self.plugins[hit[0]].append(ZilmarPluginStub(dll, hit[1], hit[0]))
+                continue
+            try:
+                p = ZilmarPluginStub.probe(dll)
+                self.plugins[p.type_name].append(p)
+                self._cache[ck] = [p.type_name, p.name]
+                dirty = True
+            except Exception:
+                pass
+        if dirty:
+            self._save_cache()
         for k in self.plugins:
             self.plugins[k].sort(key=lambda pl: pl.name.lower())
         return self.plugins
@@ -250,6 +449,8 @@ class PluginsDialog(tk.Toplevel):
         root = ttk.Frame(self)
         root.pack(fill=tk.BOTH, expand=True, padx=10, pady=10)
         self.columns = {}
+        self._lb_key = {}       # id(listbox) -> plugin kind, for one shared handler
+        self._active_key = None  # kind of the most recently clicked column
         kinds = [("Graphics (GFX)", "GFX"), ("Audio", "AUDIO"),
                  ("Input", "INPUT"), ("RSP", "RSP")]
         for col_idx, (title, key) in enumerate(kinds):
@@ -258,9 +459,10 @@ class PluginsDialog(tk.Toplevel):
             lb = tk.Listbox(lf, height=16, exportselection=False)
             lb.pack(fill=tk.BOTH, expand=True)
             self.columns[key] = lb
+            self._lb_key[id(lb)] = key
             for p in self.mgr.plugins.get(key, []):
                 lb.insert(tk.END, p.name)
-            lb.bind("<<ListboxSelect>>", lambda e, k=key: self._on_select(k))
+            lb.bind("<<ListboxSelect>>", self._on_select)
 
         for i in range(4):
             root.columnconfigure(i, weight=1)
@@ -283,15 +485,18 @@ class PluginsDialog(tk.Toplevel):
         except Exception:
             return None
 
-    def _on_select(self, key):
-        lb = self.columns[key]
-        sel = lb.curselection()
+    def _on_select(self, event):
+        key = self._lb_key.get(id(event.widget))
+        if key is None:
+            return
+        sel = event.widget.curselection()
         if not sel:
             return
         idx = sel[0]
         arr = self.mgr.plugins.get(key, [])
         if 0 <= idx < len(arr):
             self.mgr.selected[key] = arr[idx]
+            self._active_key = key
 
     def _add_plugin(self):
         path = filedialog.askopenfilename(title="Add PJ64/zilmar plugin DLL", filetypes=[("DLL", "*.dll")])
@@ -305,31 +510,13 @@ class PluginsDialog(tk.Toplevel):
             messagebox.showerror("Plugin Load Failed", str(e))
 
     def _config_selected(self):
-        hwnd = self._current_hwnd()
-        any_done = False
-        for key, lb in self.columns.items():
-            sel = lb.curselection()
-            if sel:
-                idx = sel[0]
-                arr = self.mgr.plugins.get(key, [])
-                if 0 <= idx < len(arr):
-                    if arr[idx].config(hwnd):
-                        any_done = True
-        if not any_done:
+        plugin = self.mgr.selected.get(self._active_key) if self._active_key else None
+        if plugin is None or not plugin.config(self._current_hwnd()):
             messagebox.showinfo("Plugins", "No configurable plugin selected or missing DllConfig().")
 
     def _about_selected(self):
-        hwnd = self._current_hwnd()
-        any_done = False
-        for key, lb in self.columns.items():
-            sel = lb.curselection()
-            if sel:
-                idx = sel[0]
-                arr = self.mgr.plugins.get(key, [])
-                if 0 <= idx < len(arr):
-                    if arr[idx].about(hwnd):
-                        any_done = True
-        if not any_done:
+        plugin = self.mgr.selected.get(self._active_key) if self._active_key else None
+        if plugin is None or not plugin.about(self._current_hwnd()):
             messagebox.showinfo("Plugins", "No plugin with DllAbout() selected.")
 
     def _save_and_close(self):
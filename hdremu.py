@@ -8,7 +8,11 @@ Combines core CPU emulation + test harness inside a Tkinter shell.
 
 import tkinter as tk
 from tkinter import ttk, scrolledtext
-import struct, time, threading
+import struct, time, threading, queue
+import ctypes, mmap
+from array import array
+
+_BE32 = struct.Struct('>I')  # precompiled big-endian word codec for the hot path
 
 # ============================================================
 # Core: Memory + CPU
@@ -16,37 +20,92 @@ import struct, time, threading
 class N64Memory:
     def __init__(self):
         self.rdram = bytearray(8 * 1024 * 1024)
-        self.rom = bytearray(64 * 1024 * 1024)
+        self.rom = b''  # mmap'd on load_rom; no 64 MiB idle allocation
+        self.code_pages = set()       # 4KB pages holding compiled blocks (p>>12)
+        self.invalidate_page = None   # hooked by the CPU's block cache
+        # direct-mapped 256-entry translation cache: tag = vaddr>>12,
+        # value = physical page base; one lookup replaces the range compares
+        self._xlat_tag = array('I', [0xFFFFFFFF]*256)
+        self._xlat_phys = array('I', [0]*256)
 
     def virtual_to_physical(self, address):
         address &= 0xFFFFFFFF
+        tag = address >> 12
+        idx = tag & 0xFF
+        if self._xlat_tag[idx] == tag:
+            return self._xlat_phys[idx] | (address & 0xFFF)
         if 0x80000000 <= address <= 0x9FFFFFFF or 0xA0000000 <= address <= 0xBFFFFFFF:
-            return address & 0x1FFFFFFF
-        return address
+            phys = address & 0x1FFFFFFF
+        else:
+            phys = address
+        self._xlat_tag[idx] = tag
+        self._xlat_phys[idx] = phys & 0xFFFFF000
+        return phys
+
+    def load_rom(self, path):
+        """Map a ROM file read-only; the OS page cache controls residency."""
+        f = open(path, 'rb')
+        self.rom = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+    def read_rom32(self, addr):
+        if addr + 3 < len(self.rom):
+            return _BE32.unpack_from(self.rom, addr)[0]
+        return 0
 
     def read32(self, address):
         p = self.virtual_to_physical(address)
         if p + 3 < len(self.rdram):
-            return struct.unpack('>I', self.rdram[p:p+4])[0]
+            return _BE32.unpack_from(self.rdram, p)[0]
         return 0
 
     def write32(self, address, value):
         p = self.virtual_to_physical(address)
-        if p + 3 < len(self.rdram):
-            self.rdram[p:p+4] = struct.pack('>I', value & 0xFFFFFFFF)
+        b = self.rdram
+        if p + 3 < len(b):
+            b[p]=(value>>24)&0xFF; b[p+1]=(value>>16)&0xFF
+            b[p+2]=(value>>8)&0xFF; b[p+3]=value&0xFF
+            pg = p >> 12
+            if pg in self.code_pages and self.invalidate_page:
+                self.invalidate_page(pg)
 
 
 class MIPSR4300i:
+    # Opcodes/functions that redirect control flow; a compiled block ends there.
+    _BRANCH_OPS = {0x02, 0x03, 0x04, 0x05}
+    _BRANCH_FNS = {0x08, 0x09}
+    _BLOCK_MAX = 64
+
     def __init__(self, mem):
-        self.gpr = [0]*32
+        # c_uint64 register file: stores wrap at 64 bits on their own, so the
+        # handlers need no explicit &0xFFFFFFFFFFFFFFFF mask (and no fresh
+        # PyLong per masked write).
+        self.gpr = (ctypes.c_uint64*32)()
         self.pc = 0xA4000040
         self.next_pc = self.pc+4
         self.hi = self.lo = 0
         self.memory = mem
         self.cycles = 0
+        self.block_cache = {}    # phys pc -> compiled block fn (None: starts with a branch)
+        self._icache = {}        # phys pc -> pre-decoded operand tuple
+        self._page_blocks = {}   # page -> set of block_cache keys on that page
+        mem.invalidate_page = self._invalidate_page
+        # 64-entry dispatch tables indexed directly by the 6-bit opcode/function
+        # field; one list index + call replaces the old if/elif chains.
+        self._op_table = [self._op_illegal]*64
+        for op, h in ((0x00, self._op_special), (0x02, self._op_j), (0x03, self._op_jal),
+                      (0x04, self._op_beq), (0x05, self._op_bne), (0x08, self._op_addi),
+                      (0x09, self._op_addi), (0x0C, self._op_andi), (0x0D, self._op_ori),
+                      (0x0F, self._op_lui), (0x23, self._op_lw), (0x2B, self._op_sw)):
+            self._op_table[op] = h
+        self._special_table = [self._sp_illegal]*64
+        for fn, h in ((0x00, self._sp_sll), (0x02, self._sp_srl), (0x08, self._sp_jr),
+                      (0x09, self._sp_jalr), (0x12, self._sp_mflo), (0x18, self._sp_mult),
+                      (0x20, self._sp_add), (0x21, self._sp_add), (0x22, self._sp_sub),
+                      (0x23, self._sp_sub), (0x24, self._sp_and), (0x25, self._sp_or)):
+            self._special_table[fn] = h
 
     def reset(self):
-        self.gpr = [0]*32
+        self.gpr = (ctypes.c_uint64*32)()
         self.pc = 0xA4000040
         self.next_pc = self.pc + 4
         self.hi = self.lo = 0
@@ -56,41 +115,164 @@ class MIPSR4300i:
         try: return self.memory.read32(self.pc)
         except: return 0
 
-    def decode_execute(self, ins):
-        op = (ins>>26)&0x3F
+    @staticmethod
+    def _decode(ins):
+        op=(ins>>26)&0x3F
         rs=(ins>>21)&0x1F; rt=(ins>>16)&0x1F; rd=(ins>>11)&0x1F
         sh=(ins>>6)&0x1F; fn=ins&0x3F; imm=ins&0xFFFF; tgt=ins&0x3FFFFFF
-        imm_se = imm|0xFFFFFFFFFFFF0000 if imm&0x8000 else imm
+        # branchless sign extension: xor flips the sign bit into the carry of
+        # the subtract, so no per-instruction Python conditional
+        imm_se = ((imm^0x8000)-0x8000)&0xFFFFFFFFFFFFFFFF
+        return (op,rs,rt,rd,sh,fn,imm,imm_se,tgt)
+
+    def decode_execute(self, ins):
+        op,rs,rt,rd,sh,fn,imm,imm_se,tgt = self._decode(ins)
         self.gpr[0]=0
-        if op==0x00: self._special(rs,rt,rd,sh,fn)
-        elif op==0x02: self.next_pc=(self.pc&0xF0000000)|(tgt<<2)
-        elif op==0x03: self.gpr[31]=self.pc+8; self.next_pc=(self.pc&0xF0000000)|(tgt<<2)
-        elif op==0x04 and self.gpr[rs]==self.gpr[rt]: self.next_pc=self.pc+4+(imm_se<<2)
-        elif op==0x05 and self.gpr[rs]!=self.gpr[rt]: self.next_pc=self.pc+4+(imm_se<<2)
-        elif op==0x08 or op==0x09: self.gpr[rt]=(self.gpr[rs]+imm_se)&0xFFFFFFFFFFFFFFFF
-        elif op==0x0C: self.gpr[rt]=self.gpr[rs]&imm
-        elif op==0x0D: self.gpr[rt]=self.gpr[rs]|imm
-        elif op==0x0F: self.gpr[rt]=(imm<<16)&0xFFFFFFFFFFFFFFFF
-        elif op==0x23: self.gpr[rt]=self.memory.read32(self.gpr[rs]+imm_se)
-        elif op==0x2B: self.memory.write32(self.gpr[rs]+imm_se,self.gpr[rt])
+        self._op_table[op](rs,rt,rd,sh,fn,imm,imm_se,tgt)
         self.gpr[0]=0; self.cycles+=1
 
-    def _special(self,rs,rt,rd,sh,fn):
-        if fn==0x00: self.gpr[rd]=(self.gpr[rt]<<sh)&0xFFFFFFFFFFFFFFFF
-        elif fn==0x02: self.gpr[rd]=(self.gpr[rt]>>sh)&0xFFFFFFFFFFFFFFFF
-        elif fn==0x08: self.next_pc=self.gpr[rs]
-        elif fn==0x09: self.gpr[rd]=self.pc+8; self.next_pc=self.gpr[rs]
-        elif fn==0x12: self.gpr[rd]=self.lo
-        elif fn==0x18: r=self.gpr[rs]*self.gpr[rt]; self.lo=r&0xFFFFFFFF; self.hi=(r>>32)&0xFFFFFFFF
-        elif fn==0x20 or fn==0x21: self.gpr[rd]=(self.gpr[rs]+self.gpr[rt])&0xFFFFFFFFFFFFFFFF
-        elif fn==0x22 or fn==0x23: self.gpr[rd]=(self.gpr[rs]-self.gpr[rt])&0xFFFFFFFFFFFFFFFF
-        elif fn==0x24: self.gpr[rd]=self.gpr[rs]&self.gpr[rt]
-        elif fn==0x25: self.gpr[rd]=self.gpr[rs]|self.gpr[rt]
+    # --- opcode handlers (pre-decoded operands, dispatched via _op_table) ---
+    def _op_illegal(self,rs,rt,rd,sh,fn,imm,imm_se,tgt): pass
+    def _op_special(self,rs,rt,rd,sh,fn,imm,imm_se,tgt): self._special_table[fn](rs,rt,rd,sh)
+    def _op_j(self,rs,rt,rd,sh,fn,imm,imm_se,tgt): self.next_pc=(self.pc&0xF0000000)|(tgt<<2)
+    def _op_jal(self,rs,rt,rd,sh,fn,imm,imm_se,tgt): self.gpr[31]=self.pc+8; self.next_pc=(self.pc&0xF0000000)|(tgt<<2)
+    def _op_beq(self,rs,rt,rd,sh,fn,imm,imm_se,tgt):
+        if self.gpr[rs]==self.gpr[rt]: self.next_pc=self.pc+4+(imm_se<<2)
+    def _op_bne(self,rs,rt,rd,sh,fn,imm,imm_se,tgt):
+        if self.gpr[rs]!=self.gpr[rt]: self.next_pc=self.pc+4+(imm_se<<2)
+    def _op_addi(self,rs,rt,rd,sh,fn,imm,imm_se,tgt): self.gpr[rt]=self.gpr[rs]+imm_se
+    def _op_andi(self,rs,rt,rd,sh,fn,imm,imm_se,tgt): self.gpr[rt]=self.gpr[rs]&imm
+    def _op_ori(self,rs,rt,rd,sh,fn,imm,imm_se,tgt): self.gpr[rt]=self.gpr[rs]|imm
+    def _op_lui(self,rs,rt,rd,sh,fn,imm,imm_se,tgt): self.gpr[rt]=imm<<16
+    def _op_lw(self,rs,rt,rd,sh,fn,imm,imm_se,tgt): self.gpr[rt]=self.memory.read32(self.gpr[rs]+imm_se)
+    def _op_sw(self,rs,rt,rd,sh,fn,imm,imm_se,tgt): self.memory.write32(self.gpr[rs]+imm_se,self.gpr[rt])
+
+    # --- SPECIAL handlers (dispatched via _special_table on the fn field) ---
+    def _sp_illegal(self,rs,rt,rd,sh): pass
+    def _sp_sll(self,rs,rt,rd,sh): self.gpr[rd]=self.gpr[rt]<<sh
+    def _sp_srl(self,rs,rt,rd,sh): self.gpr[rd]=self.gpr[rt]>>sh
+    def _sp_jr(self,rs,rt,rd,sh): self.next_pc=self.gpr[rs]
+    def _sp_jalr(self,rs,rt,rd,sh): self.gpr[rd]=self.pc+8; self.next_pc=self.gpr[rs]
+    def _sp_mflo(self,rs,rt,rd,sh): self.gpr[rd]=self.lo
+    def _sp_mult(self,rs,rt,rd,sh): r=self.gpr[rs]*self.gpr[rt]; self.lo=r&0xFFFFFFFF; self.hi=(r>>32)&0xFFFFFFFF
+    def _sp_add(self,rs,rt,rd,sh): self.gpr[rd]=self.gpr[rs]+self.gpr[rt]
+    def _sp_sub(self,rs,rt,rd,sh): self.gpr[rd]=self.gpr[rs]-self.gpr[rt]
+    def _sp_and(self,rs,rt,rd,sh): self.gpr[rd]=self.gpr[rs]&self.gpr[rt]
+    def _sp_or(self,rs,rt,rd,sh): self.gpr[rd]=self.gpr[rs]|self.gpr[rt]
+
+    # --- block dynarec: translate straight-line runs into compiled Python ---
+    def _invalidate_page(self, pg):
+        for key in self._page_blocks.pop(pg, ()):
+            self.block_cache.pop(key, None)
+        for key in [k for k in self._icache if k>>12 == pg]:
+            del self._icache[key]
+        self.memory.code_pages.discard(pg)
+
+    def _emit(self, ins):
+        """Codegen template for one straight-line instruction.
+        Returns a list of statements, or None if the block must end here."""
+        op=(ins>>26)&0x3F
+        rs=(ins>>21)&0x1F; rt=(ins>>16)&0x1F; rd=(ins>>11)&0x1F
+        sh=(ins>>6)&0x1F; fn=ins&0x3F; imm=ins&0xFFFF
+        imm_se = imm-0x10000 if imm&0x8000 else imm
+        if op in self._BRANCH_OPS: return None
+        if op==0x00:
+            if fn in self._BRANCH_FNS: return None
+            if fn==0x00: return [f"gpr[{rd}]=gpr[{rt}]<<{sh}"] if rd else []
+            if fn==0x02: return [f"gpr[{rd}]=gpr[{rt}]>>{sh}"] if rd else []
+            if fn==0x12: return [f"gpr[{rd}]=cpu.lo"] if rd else []
+            if fn==0x18: return [f"r=gpr[{rs}]*gpr[{rt}]",
+                                 "cpu.lo=r&0xFFFFFFFF", "cpu.hi=(r>>32)&0xFFFFFFFF"]
+            if fn in (0x20,0x21): return [f"gpr[{rd}]=gpr[{rs}]+gpr[{rt}]"] if rd else []
+            if fn in (0x22,0x23): return [f"gpr[{rd}]=gpr[{rs}]-gpr[{rt}]"] if rd else []
+            if fn==0x24: return [f"gpr[{rd}]=gpr[{rs}]&gpr[{rt}]"] if rd else []
+            if fn==0x25: return [f"gpr[{rd}]=gpr[{rs}]|gpr[{rt}]"] if rd else []
+            return []  # unimplemented special: nop, same as the interpreter
+        if op in (0x08,0x09): return [f"gpr[{rt}]=gpr[{rs}]+{imm_se}"] if rt else []
+        if op==0x0C: return [f"gpr[{rt}]=gpr[{rs}]&{imm}"] if rt else []
+        if op==0x0D: return [f"gpr[{rt}]=gpr[{rs}]|{imm}"] if rt else []
+        if op==0x0F: return [f"gpr[{rt}]={imm<<16}"] if rt else []
+        if op==0x23: return [f"gpr[{rt}]=mem.read32(gpr[{rs}]+{imm_se})"] if rt else []
+        if op==0x2B: return [f"mem.write32(gpr[{rs}]+{imm_se},gpr[{rt}])"]
+        return []  # unimplemented opcode: nop, same as the interpreter
+
+    def _compile_block(self, phys):
+        mem=self.memory
+        lines=[]; count=0
+        while count < self._BLOCK_MAX:
+            stmts = self._emit(mem.read32(phys+4*count))
+            if stmts is None: break
+            lines.extend(stmts); count+=1
+        if count==0:
+            self.block_cache[phys]=None
+            return None
+        body="".join(f"    {s}\n" for s in lines)
+        src=(f"def blk(cpu):\n    gpr=cpu.gpr\n    mem=cpu.memory\n{body}"
+             f"    cpu.pc+={4*count}\n    cpu.next_pc=cpu.pc+4\n    cpu.cycles+={count}\n")
+        ns={}
+        exec(compile(src, "<blk>", "exec"), ns)
+        fn=ns["blk"]
+        self.block_cache[phys]=fn
+        for pg in range(phys>>12, ((phys+4*count-1)>>12)+1):
+            self._page_blocks.setdefault(pg, set()).add(phys)
+            mem.code_pages.add(pg)
+        return fn
 
     def step(self):
-        ins=self.fetch(); self.decode_execute(ins)
-        self.pc=self.next_pc; self.next_pc=self.pc+4
+        _run_core(self, 1)
 
+    def run_n(self, n):
+        _run_core(self, n)
+
+
+def _run_core(cpu, n):
+    """Flat fetch/decode/execute loop for n instructions.
+
+    Everything the loop touches is bound to a local once up front, so the
+    per-instruction cost is index + call rather than chains of attribute
+    lookups — the same flat shape a jitted core would have. step() (and
+    batch runners) are thin wrappers over this."""
+    mem=cpu.memory; gpr=cpu.gpr
+    v2p=mem.virtual_to_physical; read32=mem.read32
+    blocks=cpu.block_cache; icache=cpu._icache
+    op_table=cpu._op_table; decode=cpu._decode; compile_block=cpu._compile_block
+    for _ in range(n):
+        phys=v2p(cpu.pc)
+        blk=blocks[phys] if phys in blocks else compile_block(phys)
+        if blk is not None:
+            blk(cpu)
+            continue
+        dec=icache.get(phys)
+        if dec is None:
+            dec=decode(read32(cpu.pc))
+            icache[phys]=dec
+            mem.code_pages.add(phys>>12)
+        op,rs,rt,rd,sh,fn,imm,imm_se,tgt=dec
+        gpr[0]=0
+        op_table[op](rs,rt,rd,sh,fn,imm,imm_se,tgt)
+        gpr[0]=0
+        cpu.cycles+=1
+        cpu.pc=cpu.next_pc; cpu.next_pc=cpu.pc+4
+
+
+# ============================================================
+# Built-in test program for [Run Tests]
+# ============================================================
+# Straight-line MIPS program executed from RAM through the same block
+# cache / run loop as real emulation (not via decode_execute one-offs).
+TEST_BASE = 0x1000
+TEST_PROGRAM = (
+    0x20010064,  # addi $1,$0,100
+    0x3402FF00,  # ori  $2,$0,0xFF00
+    0x00221820,  # add  $3,$1,$2
+    0x00412022,  # sub  $4,$2,$1
+    0x3407F0F0,  # ori  $7,$0,0xF0F0
+    0x00472824,  # and  $5,$2,$7
+    0x3C061234,  # lui  $6,0x1234
+    0x340800C8,  # ori  $8,$0,200
+    0x00280018,  # mult $1,$8
+    0x00004812,  # mflo $9
+)
 
 # ============================================================
 # GUI: Compact 600×400 Interface
@@ -108,42 +290,69 @@ class EMU64RelGUI:
                                             insertbackground="#0f0",font=("Consolas",10))
         self.text.pack(fill=tk.BOTH,expand=True,padx=4,pady=4)
 
+        # CPU work runs on daemon threads; they log through this queue and
+        # only the Tk thread (via the after() drain) touches the text widget.
+        self.log_q=queue.Queue()
+        self.root.after(50,self._drain_log)
+
         bar=ttk.Frame(root); bar.pack(fill=tk.X)
         ttk.Button(bar,text="Reset",command=self.reset_cpu).pack(side=tk.LEFT,padx=3)
         ttk.Button(bar,text="Step",command=self.step_once).pack(side=tk.LEFT,padx=3)
+        ttk.Button(bar,text="Run",command=self.run_batch).pack(side=tk.LEFT,padx=3)
         ttk.Button(bar,text="Run Tests",command=self.run_tests).pack(side=tk.LEFT,padx=3)
 
         self.print_line("EMU64 Rel-Edition initialized.")
         self.print_line("Ready. Click [Run Tests] to validate CPU core.")
 
-    def print_line(self,txt): self.text.insert(tk.END,txt+"\n"); self.text.see(tk.END)
+    def print_line(self,txt): self.log_q.put(txt)
+
+    def _drain_log(self):
+        lines=[]
+        try:
+            while True: lines.append(self.log_q.get_nowait())
+        except queue.Empty:
+            pass
+        if lines:
+            self.text.insert(tk.END,"\n".join(lines)+"\n")
+            self.text.see(tk.END)
+        self.root.after(50,self._drain_log)
+
     def reset_cpu(self): self.cpu.reset(); self.print_line("CPU Reset.")
 
     def step_once(self):
         self.cpu.step()
         self.print_line(f"Stepped to PC=0x{self.cpu.pc:08X}, Cycles={self.cpu.cycles}")
 
+    def run_batch(self, n=100_000):
+        # Worker thread keeps the Tk loop responsive; print_line just queues.
+        def worker():
+            self.cpu.run_n(n)
+            self.print_line(f"Ran batch of {n}. PC=0x{self.cpu.pc:08X}, Cycles={self.cpu.cycles}")
+        threading.Thread(target=worker, daemon=True).start()
+
     # Merge of test_emu64.py condensed for GUI
     def run_tests(self):
+        threading.Thread(target=self._run_tests, daemon=True).start()
+
+    def _run_tests(self):
         c=self.cpu; m=self.mem; c.reset()
         self.print_line("Running MIPS test suite…")
         try:
-            # ADDI
-            c.decode_execute(0x20010064); assert c.gpr[1]==100
-            # ORI
-            c.decode_execute(0x3402FF00); assert c.gpr[2]==0xFF00
-            # ADD
-            c.decode_execute(0x00221820); assert c.gpr[3]==100+0xFF00
-            # SUB
-            c.decode_execute(0x00412022); assert c.gpr[4]==0xFF00-100
-            # AND
-            c.gpr[1]=0xF0F0; c.gpr[2]=0xFF00
-            c.decode_execute(0x00412824); assert c.gpr[5]==(0xF0F0&0xFF00)
-            # LUI
-            c.decode_execute(0x3C061234); assert c.gpr[6]==0x12340000
-            # MULT/MFLO
-            c.gpr[1]=100; c.gpr[2]=200; c.decode_execute(0x00220018)
-            c.decode_execute(0x00001812); assert c.gpr[3]==20000
+            for i,w in enumerate(TEST_PROGRAM):
+                m.write32(TEST_BASE+4*i, w)
+            c.pc=TEST_BASE; c.next_pc=TEST_BASE+4
+            c.run_n(len(TEST_PROGRAM))
+            assert c.gpr[1]==100                # ADDI
+            assert c.gpr[2]==0xFF00             # ORI
+            assert c.gpr[3]==100+0xFF00         # ADD
+            assert c.gpr[4]==0xFF00-100         # SUB
+            assert c.gpr[5]==(0xFF00&0xF0F0)    # AND
+            assert c.gpr[6]==0x12340000         # LUI
+            assert c.gpr[9]==100*200            # MULT/MFLO
+            # sign-extension boundary values through the branchless decoder
+            for imm, want in ((0x0000,0), (0x7FFF,0x7FFF),
+                              (0x8000,0xFFFFFFFFFFFF8000), (0xFFFF,0xFFFFFFFFFFFFFFFF)):
+                assert c._decode(0x20010000|imm)[7]==want
             self.print_line("✅ All CPU tests passed.")
         except AssertionError as e:
             self.print_line("❌ Test failed: "+str(e))